@@ -37,21 +37,32 @@ Gregory Dudek
 """
 
 import base64
+import bisect
 import json
+import operator
 import os
+import queue
 import re
 import sys
-import time
 import threading
+import time
 import sqlite3
 import urllib.request
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
 from typing import Optional
 
 from bs4 import BeautifulSoup
 
 from selenium import webdriver
-from selenium.common.exceptions import NoSuchElementException, TimeoutException, WebDriverException
+from selenium.common.exceptions import (
+    NoSuchElementException,
+    StaleElementReferenceException,
+    TimeoutException,
+    WebDriverException,
+)
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.ui import WebDriverWait
@@ -61,13 +72,106 @@ OUTPUT_DIR = Path("pdf_output")
 OUTPUT_DIR.mkdir(exist_ok=True)
 DB_PATH = OUTPUT_DIR / "details.db"
 DEBUGGER_ADDRESS = os.environ.get("MINERVA_DEBUG_ADDR", "127.0.0.1:9222")
+# Optional extra Chromes for parallel processing, e.g. "127.0.0.1:9222,127.0.0.1:9223" (one worker
+# thread each, see run_parallel). Defaults to just DEBUGGER_ADDRESS, i.e. sequential. When set,
+# it replaces MINERVA_DEBUG_ADDR: main() reads the list and saves the index from the first one.
+DEBUGGER_ADDRESSES = [
+    a.strip() for a in os.environ.get("MINERVA_DEBUG_ADDRS", DEBUGGER_ADDRESS).split(",") if a.strip()
+] or [DEBUGGER_ADDRESS]
 
 # To reduce random "Unknown option" errors after many back() calls, we optionally
-# reload the list page every N processed rows. Override with env MINERVA_RELOAD_EVERY.
+# reload the list page every N back() returns to it. Rows opened in their own tab never
+# navigate the list tab, so they do not count. Override with env MINERVA_RELOAD_EVERY.
 RELOAD_EVERY = int(os.environ.get("MINERVA_RELOAD_EVERY", "2000"))
 
+# Number of detail tabs to open ahead of the one being saved, so page loads overlap.
+# 1 keeps the strict click/save/close sequence. Override with env MINERVA_PREFETCH.
+PREFETCH = max(1, int(os.environ.get("MINERVA_PREFETCH", "1")))
+
+# Most rows the SQLite writer groups into one commit when records queue up faster than it
+# commits (it always commits once the queue is empty). Override with env MINERVA_COMMIT_EVERY.
+COMMIT_EVERY = max(1, int(os.environ.get("MINERVA_COMMIT_EVERY", "50")))
+
+# Seconds parallel workers wait for each other to attach before starting anyway (see run_worker)
+WARMUP_TIMEOUT = 120
+
+# Requests Chrome drops on the tab we drive. Analytics never shows up in the PDFs; images and
+# fonts do (logos, icons), so blocking those is opt-in with env MINERVA_BLOCK_ASSETS=1.
+BLOCKED_URLS = ["*://plausible.io/*", "*://*.plausible.io/*", "*google-analytics*", "*googletagmanager*"]
+if os.environ.get("MINERVA_BLOCK_ASSETS", "") == "1":
+    BLOCKED_URLS += ["*.png", "*.jpg", "*.jpeg", "*.gif", "*.svg", "*.woff", "*.woff2", "*.ttf"]
+
+# Print [DEBUG] lines (a few per row: clicks, back() recovery) only with env MINERVA_DEBUG=1
+DEBUG = os.environ.get("MINERVA_DEBUG", "") == "1"
+
+# This matches value="View", value ="View ", etc.
+VIEW_BUTTON_XPATH = "//input[@type='button' and contains(normalize-space(@value), 'View')]"
+# A View button's row data lives in the dddefault cells of the <tr> right after the button's <tr>.
+# Anchoring on the sibling row keeps the lookup O(row) instead of walking the rest of the document.
+ROW_CELLS_XPATH = "./ancestor::tr[1]/following-sibling::tr[1]/td[contains(@class,'dddefault')][position()<=7]"
+# Fallback for other layouts: the first few dddefault cells anywhere *after* the button.
+ROW_CELLS_FALLBACK_XPATH = "./following::td[contains(@class,'dddefault')][position()<=7]"
+
+# Compiled once: these run for every table cell / row label / queue title
+_SANITIZE_RE = re.compile(r"[^\w\-]+")
+_WS_RE = re.compile(r"\s+")
+_YEAR_RE = re.compile(r"(\d{4})")
+_QUEUE_CODE_RE = re.compile(r"\s*([A-Za-z]{2})\b")
+_UPPER_PAIR_RE = re.compile(r"([A-Z]{2})")
+# Heading-ish tags table_label() falls back on, in priority order
+_LABEL_TAGS = ("h1", "h2", "h3", "h4", "strong", "b")
+# Detail-page tables worth saving: label or (lowercased) text mentions one of these
+_WANTED_TABLE_RE = re.compile("|".join(re.escape(key) for key in [
+    "paid to and requested by responsible mcgill person",
+    "payment information",
+    "summary of expenses",
+    "summary of expenses item",
+    "foapal distribution",
+    "approval information",
+    "paid to responsible",
+]))
+
+
+def debug(*args):
+    """print() a [DEBUG] line, or do nothing unless DEBUG is set."""
+    if DEBUG:
+        print("[DEBUG]", *args)
+
+
+class BackoffWait(WebDriverWait):
+    """
+    WebDriverWait that polls quickly at first and backs off: 50 ms, then x1.5 per miss, capped
+    at 250 ms. Pages here usually settle within tens of ms of the condition becoming true, so the
+    default fixed 500 ms poll mostly adds dead time per wait.
+    """
+
+    def __init__(self, driver, timeout: float, poll_frequency: float = 0.05, ignored_exceptions=None,
+                 backoff: float = 1.5, max_poll: float = 0.25):
+        super().__init__(driver, timeout, poll_frequency=poll_frequency, ignored_exceptions=ignored_exceptions)
+        self._backoff = backoff
+        self._max_poll = max(max_poll, poll_frequency)
+
+    def until(self, method, message: str = ""):
+        screen = None
+        stacktrace = None
+        poll = self._poll
+        end_time = time.monotonic() + self._timeout
+        while True:
+            try:
+                value = method(self._driver)
+                if value:
+                    return value
+            except self._ignored_exceptions as exc:
+                screen = getattr(exc, "screen", None)
+                stacktrace = getattr(exc, "stacktrace", None)
+            if time.monotonic() > end_time:
+                break
+            time.sleep(poll)
+            poll = min(poll * self._backoff, self._max_poll)
+        raise TimeoutException(message, screen, stacktrace)
+
 
-def setup_driver():
+def setup_driver(debugger_address: str = DEBUGGER_ADDRESS):
     options = webdriver.ChromeOptions()
     # IMPORTANT: we’re *not* launching Chrome here, just attaching to the one you started
     #
@@ -76,33 +180,42 @@ def setup_driver():
     #     --remote-debugging-port=9222 --user-data-dir=/tmp/chrome-minerva-profile
     #
 
-    options.add_experimental_option("debuggerAddress", DEBUGGER_ADDRESS)
+    options.add_experimental_option("debuggerAddress", debugger_address)
 
     driver = webdriver.Chrome(options=options)
-    driver.implicitly_wait(5)
+    # Explicit waits only: an implicit wait makes every miss (e.g. the "is there a Submit button?"
+    # probe, or find_elements on a page without View buttons) stall for the full timeout.
+    driver.implicitly_wait(0)
+    # Bounds wait_for_page_load's async load-event script, matching main()'s 15 s wait
+    driver.set_script_timeout(15)
+    block_urls(driver)
+    return driver
+
+
+def block_urls(driver):
+    """
+    Make the current tab skip BLOCKED_URLS downloads. CDP network settings are per tab, so
+    open_row() repeats this for every detail tab it opens.
+    """
     try:
         # Silence noisy third-party analytics failures (e.g., Plausible) that occasionally
-        # appear in Chrome logs when the network blocks them.
+        # appear in Chrome logs when the network blocks them, and skip BLOCKED_URLS downloads.
         driver.execute_cdp_cmd("Network.enable", {})
-        driver.execute_cdp_cmd(
-            "Network.setBlockedURLs",
-            {"urls": ["*://plausible.io/*", "*://*.plausible.io/*"]},
-        )
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": BLOCKED_URLS})
     except Exception:
         # Non-fatal: continue even if CDP isn’t available
         pass
-    return driver
 
 
-def ensure_debug_chrome() -> bool:
+def ensure_debug_chrome(debugger_address: str = DEBUGGER_ADDRESS) -> bool:
     """
     Fast pre-flight check for a Chrome instance started with --remote-debugging-port.
     Avoids long Selenium timeouts when Chrome isn't running.
     """
     try:
-        host, port = DEBUGGER_ADDRESS.split(":")
+        host, port = debugger_address.split(":")
     except ValueError:
-        host, port = DEBUGGER_ADDRESS, "9222"
+        host, port = debugger_address, "9222"
 
     url = f"http://{host}:{port}/json/version"
     try:
@@ -112,25 +225,44 @@ def ensure_debug_chrome() -> bool:
             json.loads(resp.read() or b"{}")
         return True
     except Exception as exc:
-        print("[ERROR] Could not reach Chrome devtools at", DEBUGGER_ADDRESS)
+        print("[ERROR] Could not reach Chrome devtools at", debugger_address)
         print("       Start Chrome first, e.g.:")
         print("       /Applications/Google\\ Chrome.app/Contents/MacOS/Google\\ Chrome \\")
         print("         --remote-debugging-port=9222 --user-data-dir=/tmp/chrome-minerva-profile")
         print(f"       ({exc})")
         return False
 
-def print_current_page_to_pdf(driver: webdriver.Chrome, output_path: Path):
-    """Use Chrome DevTools Page.printToPDF to dump the current page to a PDF file."""
+def print_current_page_to_pdf(driver: webdriver.Chrome, output_path: Path, chunk_size: int = 1 << 20):
+    """
+    Use Chrome DevTools Page.printToPDF to dump the current page to a PDF file.
+    The PDF comes back as a CDP stream read in chunks straight into the file, rather than one
+    giant base64 string held (and decoded) in memory.
+    """
     pdf = driver.execute_cdp_cmd(
         "Page.printToPDF",
         {
             "printBackground": True,
             "landscape": False,
             "preferCSSPageSize": True,
+            "transferMode": "ReturnAsStream",
         },
     )
-    pdf_bytes = base64.b64decode(pdf["data"])
-    output_path.write_bytes(pdf_bytes)
+    stream = pdf.get("stream")
+    if not stream:
+        # Older Chrome ignores transferMode and returns the data inline
+        output_path.write_bytes(base64.b64decode(pdf["data"]))
+        return
+
+    try:
+        with output_path.open("wb") as f:
+            while True:
+                chunk = driver.execute_cdp_cmd("IO.read", {"handle": stream, "size": chunk_size})
+                data = chunk.get("data", "")
+                f.write(base64.b64decode(data) if chunk.get("base64Encoded") else data.encode("utf-8"))
+                if chunk.get("eof"):
+                    break
+    finally:
+        driver.execute_cdp_cmd("IO.close", {"handle": stream})
 
 
 def sanitize_filename(text: str) -> str:
@@ -138,72 +270,74 @@ def sanitize_filename(text: str) -> str:
     if not text:
         return "unnamed"
     # Replace anything not alphanumeric, dash, or underscore
-    text = re.sub(r"[^\w\-]+", "_", text)
+    text = _SANITIZE_RE.sub("_", text)
     return text[:80]  # keep filenames reasonable in length
 
 
+@lru_cache(maxsize=2048)
 def normalize_header(text: str) -> str:
-    """Normalize table header text for matching."""
-    return re.sub(r"\s+", " ", text.strip()).lower()
+    """Normalize table header text for matching. Cached: the same few headers and labels repeat in every report."""
+    return _WS_RE.sub(" ", text.strip()).lower()
 
 
 def extract_year(date_text: str) -> str:
     """Return the first 4-digit year found in the date text, or "" if none."""
-    m = re.search(r"(\d{4})", date_text)
+    m = _YEAR_RE.search(date_text)
     return m.group(1) if m else ""
 
 
-def table_to_pretty_lines(table_tag) -> list[str]:
-    """Return a list of strings with padded columns for readability."""
+def read_table(table_tag):
+    """
+    Walk a table once and return (headers, rows, has_header): the normalized <th> texts, each
+    <tr>'s cell texts ([""] for an empty spacer row), and whether the first row holds a <th>.
+    """
+    headers = []
+    seen_th = set()  # a nested table's cells also show up under the outer <tr>; count each <th> once
     rows = []
+    has_header = False
     for tr in table_tag.find_all("tr"):
-        cells = [c.get_text(strip=True, separator=" ") for c in tr.find_all(["th", "td"])]
-        if cells:
-            rows.append(cells)
-        else:
-            # preserve blank spacer rows for readability
-            rows.append([""])
+        cells = tr.find_all(["th", "td"])
+        if not rows:
+            has_header = any(c.name == "th" for c in cells)
+        texts = [c.get_text(" ", strip=True) for c in cells]
+        for c, text in zip(cells, texts):
+            if c.name == "th" and id(c) not in seen_th:
+                seen_th.add(id(c))
+                headers.append(normalize_header(text))
+        rows.append(texts or [""])
+    return headers, rows, has_header
+
+
+def table_to_pretty_lines(rows: list[list[str]], has_header: bool) -> list[str]:
+    """Return a list of strings with padded columns for readability, from read_table()'s rows."""
     if not rows:
         return []
 
-    # Normalize column count to the widest row
-    max_cols = max(len(r) for r in rows)
+    # Column widths (the longest cell in each column); their count is the widest row's
+    widths = []
     for r in rows:
-        while len(r) < max_cols:
-            r.append("")
-
-    widths = [max(len(r[c]) for r in rows) for c in range(max_cols)]
+        for c, text in enumerate(r):
+            if c == len(widths):
+                widths.append(len(text))
+            elif len(text) > widths[c]:
+                widths[c] = len(text)
+    max_cols = len(widths)
+    underline = " | ".join("-" * w for w in widths)
+    # One format string pads a whole row in a single call
+    row_format = " | ".join(f"{{:<{w}}}" for w in widths)
 
     lines = []
-    # Detect header row (any <th> in first row)
-    has_header = bool(table_tag.find("tr").find("th"))
-
     for i, r in enumerate(rows):
-        padded = [r[c].ljust(widths[c]) for c in range(max_cols)]
-        lines.append(" | ".join(padded).rstrip())
+        padded = r + [""] * (max_cols - len(r))
+        lines.append(row_format.format(*padded).rstrip())
         if has_header and i == 0:
             # add underline after header
-            underline = " | ".join("-" * widths[c] for c in range(max_cols))
             lines.append(underline)
     return lines
 
 
-def parse_table_rows(table_tag):
-    headers = [normalize_header(h.get_text(" ", strip=True)) for h in table_tag.find_all("th")]
-    rows = []
-    for tr in table_tag.find_all("tr"):
-        cells = tr.find_all(["th", "td"])
-        if not cells:
-            rows.append([""])
-            continue
-        row = [c.get_text(" ", strip=True) for c in cells]
-        rows.append(row)
-    return headers, rows
-
-
-def extract_summary_items(table_tag, label: str):
-    headers, rows = parse_table_rows(table_tag)
-
+def extract_summary_items(headers: list[str], rows: list[list[str]], label: str):
+    """Turn a Summary of Expenses table, as read_table()'s headers and rows, into item dicts."""
     key_map = {
         "item_no": ["item #", "item"],
         "trans_date": ["trans. date", "trans date", "transaction date"],
@@ -223,35 +357,28 @@ def extract_summary_items(table_tag, label: str):
                 col_index[key] = headers.index(alias)
                 break
 
+    # Fallback positional mapping if headers missing (key_map is in the usual column order)
+    positional = {key: i for i, key in enumerate(key_map)}
+
     def get(cell_row, key, default=""):
         idx = col_index.get(key)
         if idx is not None and idx < len(cell_row):
             return cell_row[idx]
-        # Fallback positional mapping if headers missing
-        positional = [
-            "item_no",
-            "trans_date",
-            "description",
-            "trans_amount",
-            "non_mc_expense",
-            "allowable_expense",
-            "currency",
-            "exch_rate",
-            "cad_amount",
-        ]
-        if key in positional:
-            idx = positional.index(key)
+        idx = positional.get(key)
+        if idx is not None:
             return cell_row[idx] if idx < len(cell_row) else default
         return default
 
+    header_set = set(headers)
     items = []
     for i, row in enumerate(rows):
         # Skip header row that matches headers length/values
-        if headers and all(normalize_header(x) in headers for x in row):
+        if header_set and all(normalize_header(x) in header_set for x in row):
             continue
         if all(not cell.strip() for cell in row):
             continue
-        row_type = "total" if (normalize_header(row[0]).startswith("total") or "grand total" in normalize_header(row[0]) or "due to claimant" in normalize_header(row[0])) else "item"
+        first = normalize_header(row[0])
+        row_type = "total" if (first.startswith("total") or "grand total" in first or "due to claimant" in first) else "item"
         items.append(
             {
                 "row_order": i,
@@ -272,10 +399,11 @@ def extract_summary_items(table_tag, label: str):
     return items
 
 
-def extract_overview_data(soup: BeautifulSoup, summary_items: list[dict]) -> dict:
+def extract_overview_data(tables: list[tuple], summary_items: list[dict], read=read_table) -> dict:
     """
     Pull a handful of high-level fields from the detail page so they can live
-    together in one easy-to-query table.
+    together in one easy-to-query table. `tables` holds the (table, label, lowercased text)
+    triples save_detail_text already computed, and `read` its cached read_table().
     """
     overview = {
         "paid_to": "",
@@ -286,16 +414,13 @@ def extract_overview_data(soup: BeautifulSoup, summary_items: list[dict]) -> dic
         "ref_code": "",
     }
 
-    tables = find_tables_after_heading(soup, "Request for Expense Reimbursement")
-
     def headers_and_rows(tbl):
-        hdrs, rows = parse_table_rows(tbl)
+        hdrs, rows, _ = read(tbl)
         hdrs_norm = [normalize_header(h) for h in hdrs]
         return hdrs_norm, rows
 
     # Paid to (a table whose text mentions "Paid to" and has a Name column)
-    for tbl in tables:
-        tbl_text = tbl.get_text(" ", strip=True).lower()
+    for tbl, _, tbl_text in tables:
         if "paid to" not in tbl_text:
             continue
         hdrs, rows = headers_and_rows(tbl)
@@ -327,9 +452,8 @@ def extract_overview_data(soup: BeautifulSoup, summary_items: list[dict]) -> dic
             break
 
     # Payment Information table → destination city + descriptive text
-    for tbl in tables:
-        label = table_label(tbl).lower()
-        tbl_text = tbl.get_text(" ", strip=True).lower()
+    for tbl, label, tbl_text in tables:
+        label = label.lower()
         if "payment information" not in label and "payment information" not in tbl_text:
             continue
         hdrs, rows = headers_and_rows(tbl)
@@ -356,9 +480,8 @@ def extract_overview_data(soup: BeautifulSoup, summary_items: list[dict]) -> dic
         break
 
     # Approval Information table → request status
-    for tbl in tables:
-        label = table_label(tbl).lower()
-        tbl_text = tbl.get_text(" ", strip=True).lower()
+    for tbl, label, tbl_text in tables:
+        label = label.lower()
         if "approval information" not in label and "approval information" not in tbl_text:
             continue
         hdrs, rows = headers_and_rows(tbl)
@@ -395,9 +518,8 @@ def extract_overview_data(soup: BeautifulSoup, summary_items: list[dict]) -> dic
             )
             break
     if not overview["grand_total"]:
-        for tbl in tables:
-            label = table_label(tbl).lower()
-            tbl_text = tbl.get_text(" ", strip=True).lower()
+        for tbl, label, tbl_text in tables:
+            label = label.lower()
             if "summary of expenses" not in label and "summary of expenses" not in tbl_text:
                 continue
             _, rows = headers_and_rows(tbl)
@@ -412,8 +534,27 @@ def extract_overview_data(soup: BeautifulSoup, summary_items: list[dict]) -> dic
     return overview
 
 
-def table_label(table_tag) -> str:
-    """Infer a human-friendly label for a table using nearby text."""
+def index_headings(soup: BeautifulSoup) -> dict:
+    """
+    One pass over the document for table_label(): every tag's document-order position
+    ("pos": id(tag) -> int) and, per _LABEL_TAGS kind, the positions and tags of that kind in order.
+    """
+    pos = {}
+    kinds = {name: ([], []) for name in _LABEL_TAGS}
+    for i, el in enumerate(soup.find_all(True)):
+        pos[id(el)] = i
+        if el.name in kinds:
+            kinds[el.name][0].append(i)
+            kinds[el.name][1].append(el)
+    return {"pos": pos, **kinds}
+
+
+def table_label(table_tag, headings: dict) -> str:
+    """
+    Infer a human-friendly label for a table using nearby text. `headings` is index_headings()'s
+    result, so the nearest preceding headings are found by bisection instead of walking back
+    through the page.
+    """
     # Caption takes priority
     if table_tag.caption and table_tag.caption.get_text(strip=True):
         return table_tag.caption.get_text(strip=True)
@@ -427,9 +568,16 @@ def table_label(table_tag) -> str:
         prev = prev.previous_sibling
         steps += 1
 
-    # Check parent heading tags
-    for tag_name in ["h1", "h2", "h3", "h4", "strong", "b"]:
-        heading = table_tag.find_previous(tag_name)
+    # Check parent heading tags: the nearest h1 wins, else the nearest h2, ... else the nearest b.
+    nearest = {}
+    table_pos = headings["pos"][id(table_tag)]
+    for name in _LABEL_TAGS:
+        positions, tags = headings[name]
+        i = bisect.bisect_left(positions, table_pos)
+        if i:
+            nearest[name] = tags[i - 1]
+    for tag_name in _LABEL_TAGS:
+        heading = nearest.get(tag_name)
         if heading and heading.get_text(strip=True):
             return heading.get_text(strip=True)
 
@@ -451,8 +599,27 @@ def find_tables_after_heading(soup: BeautifulSoup, heading_text: str):
     return list(soup.find_all("table"))
 
 
-def init_db():
-    conn = sqlite3.connect(DB_PATH)
+def connect_db() -> sqlite3.Connection:
+    """
+    Open DB_PATH with write-friendly settings: WAL plus synchronous=NORMAL means a commit no
+    longer waits on two fsyncs. WAL sticks to the database file; the rest are per connection.
+    page_size only takes effect on a new, empty database (it must come before WAL is switched on);
+    mmap_size lets index upkeep read B-tree pages through a mapping instead of a read() each.
+    Opened by the main thread but used only by db_writer's thread, hence check_same_thread=False.
+    """
+    conn = sqlite3.connect(DB_PATH, check_same_thread=False)
+    conn.execute("PRAGMA page_size=8192")
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA cache_size=-20000")
+    conn.execute("PRAGMA mmap_size=268435456")  # 256 MiB
+    return conn
+
+
+def init_db() -> sqlite3.Connection:
+    """Create the tables if needed and return the open connection for the rest of the run."""
+    conn = connect_db()
     cur = conn.cursor()
     cur.execute(
         """
@@ -524,52 +691,64 @@ def init_db():
         )
         """
     )
+    # Indexes for the lookups shown in the module docstring (items/sections by request, requests by reference #).
+    # reference_num is not unique: the same request can be saved again by a later run.
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_items_req ON summary_items(request_id, row_order)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_sections_req ON sections(request_id)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_requests_ref ON requests(reference_num)")
+    # Lets save_request() find an earlier save of the same row file cheaply
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_requests_pdf ON requests(pdf_path)")
     conn.commit()
-    conn.close()
-
+    return conn
 
-def save_detail_text(driver, path: Path):
-    """Save a readable text version of the current detail page and return structured sections, items, and overview."""
-    soup = BeautifulSoup(driver.page_source, "html.parser")
 
-    tables = find_tables_after_heading(soup, "Request for Expense Reimbursement")
+def save_detail_text(html: str, path: Path):
+    """Save a readable text version of a detail page's HTML and return structured sections, items, and overview."""
+    soup = BeautifulSoup(html, "lxml")
 
-    wanted = [
-        "paid to and requested by responsible mcgill person",
-        "payment information",
-        "summary of expenses",
-        "summary of expenses item",
-        "foapal distribution",
-        "approval information",
-        "paid to responsible",
+    # Label and text of each table are needed by both the section dump and the overview;
+    # work them out once. The heading index saves table_label a backward walk per table.
+    headings = index_headings(soup)
+    tables = [
+        (tbl, table_label(tbl, headings), tbl.get_text(" ", strip=True).lower())
+        for tbl in find_tables_after_heading(soup, "Request for Expense Reimbursement")
     ]
 
-    def table_matches(tbl):
-        label = table_label(tbl).strip().lower()
-        text = tbl.get_text(" ", strip=True).lower()
-        return any(key in label or key in text for key in wanted)
+    reads = {}
+
+    def read(tbl):
+        # Each table is walked at most once per page: the overview revisits several saved tables
+        if id(tbl) not in reads:
+            reads[id(tbl)] = read_table(tbl)
+        return reads[id(tbl)]
+
+    def table_matches(label, text):
+        return bool(_WANTED_TABLE_RE.search(f"{label.lower()}\n{text}"))
 
     lines = []
     sections = []
     summary_items = []
-    for tbl in tables:
-        if table_matches(tbl):
-            label = table_label(tbl).strip() or "Table"
+    for tbl, label, text in tables:
+        if table_matches(label, text):
+            label = label.strip() or "Table"
+            # One walk of the table feeds both the text dump and the summary items
+            headers, rows, has_header = read(tbl)
             lines.append(f"=== {label} ===")
-            pretty = table_to_pretty_lines(tbl) or ["(table empty)"]
+            pretty = table_to_pretty_lines(rows, has_header) or ["(table empty)"]
             lines.extend(pretty)
             lines.append("")
             sections.append((label, "\n".join(pretty)))
 
             if "summary of expenses" in label.lower():
-                summary_items.extend(extract_summary_items(tbl, label))
+                summary_items.extend(extract_summary_items(headers, rows, label))
 
     if not lines:
         # Fallback: dump up to first 5 tables with labels for debugging
-        for tbl in tables[:5]:
-            label = table_label(tbl).strip() or "Table"
+        for tbl, label, _ in tables[:5]:
+            label = label.strip() or "Table"
+            _, rows, has_header = read(tbl)
             lines.append(f"=== {label} ===")
-            pretty = table_to_pretty_lines(tbl) or ["(table empty)"]
+            pretty = table_to_pretty_lines(rows, has_header) or ["(table empty)"]
             lines.extend(pretty)
             lines.append("")
             sections.append((label, "\n".join(pretty)))
@@ -578,31 +757,36 @@ def save_detail_text(driver, path: Path):
         lines = ["(no tables found)"]
         sections.append(("(no tables found)", ""))
 
-    path.write_text("\n".join(lines).rstrip() + "\n", encoding="utf-8")
-    overview = extract_overview_data(soup, summary_items)
+    # Same content as "\n".join(lines).rstrip() + "\n", written line by line instead of as one big string
+    last = max((i for i, line in enumerate(lines) if line.strip()), default=None)
+    with path.open("w", encoding="utf-8") as f:
+        if last is not None:
+            f.writelines(f"{line}\n" for line in lines[:last])
+            f.write(lines[last].rstrip())
+        f.write("\n")
+    overview = extract_overview_data(tables, summary_items, read)
     return sections, summary_items, overview
 
 
-def start_blinking_prompt(prompt: str = "> ", interval: float = 0.5):
-    """Show a blinking block cursor after the prompt until the returned event is set."""
-    stop_event = threading.Event()
-
-    def run():
-        visible = True
-        while not stop_event.is_set():
-            block = "\u2588" if visible else " "
-            sys.stdout.write(f"\r{prompt}{block}")
-            sys.stdout.flush()
-            visible = not visible
-            # wait allows early exit when stop_event is set
-            stop_event.wait(interval)
-        # clear block and leave prompt visible
-        sys.stdout.write(f"\r{prompt}")
+def start_blinking_prompt(prompt: str = "> "):
+    """
+    Show the prompt with the terminal's own blinking block cursor (DECSCUSR), so no thread has to
+    redraw it. Returns a function that restores the default cursor shape. When stdout is not a
+    terminal (piped/redirected), only the plain prompt is written.
+    """
+    if not sys.stdout.isatty():
+        sys.stdout.write(prompt)
+        sys.stdout.flush()
+        return lambda: None
+
+    sys.stdout.write(f"\r{prompt}\x1b[1 q")
+    sys.stdout.flush()
+
+    def restore():
+        sys.stdout.write("\x1b[0 q")
         sys.stdout.flush()
 
-    t = threading.Thread(target=run, daemon=True)
-    t.start()
-    return stop_event
+    return restore
 
 
 def extract_row_fields(btn):
@@ -613,11 +797,10 @@ def extract_row_fields(btn):
     with class `dddefault`.
     """
     try:
-        # Grab the first few dddefault cells that appear *after* this button.
-        cells = btn.find_elements(
-            By.XPATH,
-            "./following::td[contains(@class,'dddefault')][position()<=7]"
-        )
+        # Grab the dddefault cells of the data row that follows this button's row.
+        cells = btn.find_elements(By.XPATH, ROW_CELLS_XPATH)
+        if len(cells) <= 5:
+            cells = btn.find_elements(By.XPATH, ROW_CELLS_FALLBACK_XPATH)
 
         # Expected order (index-based) from the provided markup example:
         # 0 name, 1 request date, 2 location, 3 travel/start date, 4 code,
@@ -634,6 +817,37 @@ def extract_row_fields(btn):
         return "", "", "", ""
 
 
+def harvest_rows(driver) -> list[tuple[str, str, str, str]]:
+    """
+    Same fields as extract_row_fields, but for every View button at once: the XPath walks
+    run inside the browser in a single execute_script instead of ~9 WebDriver round trips per row.
+    Returns one (request_date, reference_num, queue_title, start_date) tuple per button, in
+    get_view_buttons() order.
+    """
+    rows = driver.execute_script(
+        """
+        const snap = (xpath, ctx) =>
+            document.evaluate(xpath, ctx, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+        const buttons = snap(arguments[0], document);
+        const rows = [];
+        for (let i = 0; i < buttons.snapshotLength; i++) {
+            let cells = snap(arguments[1], buttons.snapshotItem(i));
+            if (cells.snapshotLength <= 5) {
+                cells = snap(arguments[2], buttons.snapshotItem(i));
+            }
+            const text = j => j < cells.snapshotLength ? cells.snapshotItem(j).innerText.trim() : "";
+            const ref = cells.snapshotLength > 5 ? cells.snapshotItem(5) : null;
+            rows.push([text(1), text(5), ref ? (ref.getAttribute("title") || "") : "", text(3)]);
+        }
+        return rows;
+        """,
+        VIEW_BUTTON_XPATH,
+        ROW_CELLS_XPATH,
+        ROW_CELLS_FALLBACK_XPATH,
+    )
+    return [tuple(r) for r in rows or []]
+
+
 def extract_queue_code(queue_title: str) -> str:
     """
     Return the leading two-letter code from the queue title
@@ -642,33 +856,62 @@ def extract_queue_code(queue_title: str) -> str:
     if not queue_title:
         return ""
     # Common pattern: "AR - APPROVED - Extract Data to Banner"
-    m = re.match(r"\s*([A-Za-z]{2})\b", queue_title)
+    m = _QUEUE_CODE_RE.match(queue_title)
     if m:
         return m.group(1).upper()
     # Fallback: first two consecutive uppercase letters anywhere
-    m = re.search(r"([A-Z]{2})", queue_title)
+    m = _UPPER_PAIR_RE.search(queue_title)
     return m.group(1).upper() if m else ""
 
 
-def is_unknown_option_page(html: str) -> bool:
-    """Detect the 'Unknown option: abc' error page seen after many back() calls."""
-    # Be strict: the stop icon appears on other pages; rely on explicit text
-    return (
-        ("Unknown option" in html and "abc" in html)
-        or 'errortext">*** Unknown option' in html
+def page_flags(driver) -> dict:
+    """
+    Classify the current page inside the browser and return a handful of booleans instead of
+    shipping the whole driver.page_source over the wire for Python-side substring checks:
+      view_all         'View All Requests' appears anywhere (list or its query form)
+      list             'View All Requests' list (both marker strings present)
+      view_buttons     at least one View button present
+      finance_menu     'Advances and Expense Reports Menu' (went back too far)
+      search_results   intermediate 'Search Results' page
+      no_exact         'Your search results returned no exact matches'
+      unknown_option   '*** Unknown option: abc' error page seen after many back() calls
+    """
+    return driver.execute_script(
+        """
+        const html = document.documentElement.outerHTML;
+        const lower = html.toLowerCase();
+        const buttons = document.evaluate(arguments[0], document, null,
+            XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+        return {
+            view_all: html.includes("View All Requests"),
+            list: html.includes("View All Requests") && html.includes("Select Document or Request"),
+            view_buttons: buttons !== null,
+            finance_menu: html.includes("Advances and Expense Reports Menu"),
+            search_results: lower.includes("search results"),
+            no_exact: lower.includes("your search results returned no exact matches"),
+            // Be strict: the stop icon appears on other pages; rely on explicit text
+            unknown_option: (html.includes("Unknown option") && html.includes("abc"))
+                || html.includes('errortext">*** Unknown option'),
+        };
+        """,
+        VIEW_BUTTON_XPATH,
     )
 
 
-def is_search_results_page(html: str) -> bool:
-    """Detect the intermediate 'Search Results' page shown after a query."""
-    print("[DEBUG] See Search Results page")
-    time.sleep(1)
-    return "search results" in html.lower()
+# Wait conditions, defined once rather than as per-call lambdas
+
+def ready_state_complete(driver) -> bool:
+    return driver.execute_script("return document.readyState") == "complete"
 
 
-def is_no_exact_matches_page(html: str) -> bool:
-    """Detect the 'Your search results returned no exact matches' page."""
-    return "your search results returned no exact matches" in html.lower()
+def left_about_blank(driver) -> bool:
+    """A fresh tab reports a "complete" about:blank until its first navigation commits."""
+    return driver.current_url not in ("", "about:blank")
+
+
+def submit_landed(driver) -> bool:
+    flags = page_flags(driver)
+    return flags["view_all"] or flags["view_buttons"]
 
 
 def click_submit_if_present(driver, wait) -> bool:
@@ -684,7 +927,7 @@ def click_submit_if_present(driver, wait) -> bool:
 
     submit_btn.click()
     try:
-        wait.until(lambda d: "View All Requests" in d.page_source or bool(get_view_buttons(d)))
+        wait.until(submit_landed)
     except TimeoutException:
         pass
     return True
@@ -697,31 +940,60 @@ def reload_like_user(driver, wait):
     except Exception:
         driver.refresh()
     try:
-        wait.until(lambda d: d.execute_script("return document.readyState") == "complete")
+        wait_for_page_load(driver, wait)
     except TimeoutException:
         pass
 
 
-def wait_for_navigation(driver, old_url: str, clicked_element=None, timeout: float = 8.0, poll: float = 0.2) -> bool:
+def wait_for_page_load(driver, wait):
     """
-    Wait for either a URL change or the clicked element to go stale.
+    Block until the current document has fired its load event. An async script resolves the
+    moment the page reports complete, instead of polling document.readyState from Python.
+    Raises TimeoutException like wait.until(); if the script is cut off by a late navigation,
+    falls back to polling readyState with the given wait.
+    """
+    try:
+        driver.execute_async_script(
+            "const done = arguments[arguments.length - 1];"
+            "if (document.readyState === 'complete') { done(true); }"
+            "else { window.addEventListener('load', () => done(true), {once: true}); }"
+        )
+    except TimeoutException:
+        raise
+    except WebDriverException:
+        wait.until(ready_state_complete)
+
+
+def wait_for_navigation(driver, old_url: str, clicked_element=None, timeout: float = 8.0, poll: float = 0.05,
+                        handles_before: Optional[set] = None) -> bool:
+    """
+    Wait for either a URL change, the clicked element to go stale, or (if handles_before is given) a new tab.
     Returns True if navigation/staleness detected, False on timeout.
-    Uses a shorter timeout/poll than the main wait to avoid long stalls when the site is slow.
+    Uses a shorter timeout and a fast backoff poll (see BackoffWait) to avoid long stalls when the site is slow.
     Safely ignores "Node does not belong to the document" inspector errors that can occur after many clicks.
+    Each poll costs one script round trip for the URL and staleness checks; with handles_before it is
+    preceded by a window_handles call (a page script cannot see other tabs), which ends the wait on
+    its own as soon as the new tab exists.
     """
-    nav_wait = WebDriverWait(driver, timeout, poll_frequency=poll, ignored_exceptions=(WebDriverException,))
-    stale_check = EC.staleness_of(clicked_element) if clicked_element else None
+    nav_wait = BackoffWait(driver, timeout, poll_frequency=poll, ignored_exceptions=(WebDriverException,))
 
     def condition(d):
-        if d.current_url != old_url:
+        if handles_before is not None and len(d.window_handles) > len(handles_before):
             return True
-        if stale_check:
-            try:
-                return stale_check(d)
-            except WebDriverException:
-                # Element already gone from DOM; treat as staleness achieved
+        try:
+            # One round trip for both in-page signals: the page URL and whether the element is still attached
+            url, attached = d.execute_script(
+                "return [location.href, arguments[0] ? arguments[0].isConnected : true];", clicked_element
+            )
+        except StaleElementReferenceException:
+            # Element already gone from DOM; treat as staleness achieved
+            return True
+        except WebDriverException:
+            if clicked_element is not None:
+                # Page torn down mid-call (inspector "Node does not belong to the document" etc.)
                 return True
-        return False
+            raise
+        return url != old_url or not attached
 
     try:
         nav_wait.until(condition)
@@ -731,6 +1003,36 @@ def wait_for_navigation(driver, old_url: str, clicked_element=None, timeout: flo
         return False
 
 
+def open_detail_tab(driver, btn, old_url: str, timeout: float = 8.0) -> Optional[str]:
+    """
+    Click a View button so the detail page opens in a new tab and the list tab never navigates.
+    A temporary <base target="_blank"> redirects the form POST behind the button into a fresh tab
+    (Selenium's click is a real user gesture, so the popup blocker lets it through).
+    Returns the new window handle, or None if the click navigated the list tab in place
+    (e.g. the onclick handler assigns location directly); callers then fall back to back().
+    """
+    handles_before = set(driver.window_handles)
+    driver.execute_script(
+        "if (!document.getElementById('minerva-extract-base')) {"
+        "  const b = document.createElement('base');"
+        "  b.id = 'minerva-extract-base'; b.target = '_blank';"
+        "  (document.head || document.documentElement).appendChild(b);"
+        "}"
+    )
+    btn.click()
+
+    try:
+        wait_for_navigation(driver, old_url, btn, timeout=timeout, handles_before=handles_before)
+    finally:
+        try:
+            # Only matters if the list tab is still current; a page that navigated in place has no base anyway
+            driver.execute_script("const b = document.getElementById('minerva-extract-base'); if (b) b.remove();")
+        except WebDriverException:
+            pass
+    new_handles = [h for h in driver.window_handles if h not in handles_before]
+    return new_handles[0] if new_handles else None
+
+
 def ensure_list_page(driver, wait, list_url: Optional[str] = None) -> bool:
     """
     Make sure we're on the 'View All Requests' list page, not a detail view.
@@ -740,88 +1042,84 @@ def ensure_list_page(driver, wait, list_url: Optional[str] = None) -> bool:
     list_url is kept only for logging/backward compatibility.
     """
     def is_list():
-        html = driver.page_source
-        if "View All Requests" in html and "Select Document or Request" in html:
-            return True
+        flags = page_flags(driver)
         # Fallback: presence of any View buttons is a strong signal we're back
-        return bool(get_view_buttons(driver))
+        return flags["list"] or flags["view_buttons"]
 
     # First, check current page without navigation
     if is_list():
         return True
 
     for attempt in range(5):
-        html = driver.page_source
+        flags = page_flags(driver)
         # If we went too far back (main finance menu), step forward again.
-        if "Advances and Expense Reports Menu" in html:
+        if flags["finance_menu"]:
             print(f"[WARN] Landed on finance menu while recovering (attempt {attempt + 1}/5); going forward once.")
             driver.forward()
             try:
-                wait.until(lambda d: d.execute_script("return document.readyState") == "complete")
+                wait_for_page_load(driver, wait)
             except TimeoutException:
                 pass
-            html = driver.page_source
+            flags = page_flags(driver)
 
         # New: handle intermediate Search Results page. If it shows 'no exact matches',
         # skip the hidden submit and just go back; otherwise back then submit.
-        if is_search_results_page(html) and is_search_results_page(html) :
-            no_exact = is_no_exact_matches_page(html)
+        if flags["search_results"]:
+            no_exact = flags["no_exact"]
             action = "back only (no exact matches)" if no_exact else "back then submit"
             print(f"[WARN] Detected 'Search Results' page (attempt {attempt + 1}/5); action: {action}.")
             driver.back()
             time.sleep(2)
             try:
-                wait.until(lambda d: d.execute_script("return document.readyState") == "complete")
+                wait_for_page_load(driver, wait)
             except TimeoutException:
                 pass
-            html = driver.page_source
+            flags = page_flags(driver)
 
             if no_exact:
                 # do NOT click submit; just continue recovery/back logic
-                if "View All Requests" in html and "Select Document or Request" in html:
-                    return True
-                if get_view_buttons(driver):
+                if flags["list"] or flags["view_buttons"]:
                     return True
             else:
                 # After returning, hit the Submit button if present to regain the list page
                 if click_submit_if_present(driver, wait):
-                    html = driver.page_source
                     if is_list():
                         return True
-        if "View All Requests" in html and "Select Document or Request" in html:
+                    flags = page_flags(driver)
+        if flags["list"]:
             return True  # this is the list
-        if get_view_buttons(driver):
+        if flags["view_buttons"]:
             return True
 
         # Special case: after many back() calls the server sometimes shows
         # "*** Unknown option: abc". Try one more back() and, if needed,
         # click the page's Submit button to return to the list.
-        if is_unknown_option_page(html):
+        if flags["unknown_option"]:
             print(f"[WARN] Detected 'Unknown option' page (attempt {attempt + 1}/5); trying recovery.")
             # First back
             driver.back()
             time.sleep(2)
             try:
-                wait.until(lambda d: d.execute_script("return document.readyState") == "complete")
+                wait_for_page_load(driver, wait)
             except TimeoutException:
-                print("[DEBUG] TimeoutException")
+                debug("TimeoutException")
                 pass
 
             # After first back, if we see a submit button, click it; otherwise if still on the
             # unknown page, back once more, then click submit if present.
-            print("[DEBUG] Looking for submit button")
+            debug("Looking for submit button")
             if click_submit_if_present(driver, wait):
-                print("[DEBUG] Clicked submit")
+                debug("Clicked submit")
                 return True
 
-            if is_unknown_option_page(driver.page_source):
+            if page_flags(driver)["unknown_option"]:
                 print(f"[WARN] Detected 'Unknown option' page AGAIN! (attempt {attempt + 1}/5); trying recovery.")
                 driver.back()
                 time.sleep(1)
                 try:
-                    wait.until(lambda d: d.execute_script("return document.readyState") == "complete")
+                    wait_for_page_load(driver, wait)
                 except TimeoutException:
-                    print("[DEBUG] TimeoutException")
+                    debug("TimeoutException")
                     pass
                 if click_submit_if_present(driver, wait):
                     return True
@@ -831,11 +1129,9 @@ def ensure_list_page(driver, wait, list_url: Optional[str] = None) -> bool:
         # If we're on a 'View' / detail page, try going back
         driver.back()
         try:
-            wait.until(
-                lambda d: d.execute_script("return document.readyState") == "complete"
-            )
+            wait_for_page_load(driver, wait)
         except TimeoutException:
-            print("[DEBUG] Clicked submit")
+            debug("Clicked submit")
             pass
 
     # As a final fallback, mimic the user's reload; avoid driver.get(list_url) to preserve form state
@@ -845,71 +1141,508 @@ def ensure_list_page(driver, wait, list_url: Optional[str] = None) -> bool:
 
     return False
 
+def page_html(driver) -> str:
+    """
+    The page HTML for parsing, minus <script>/<style>/<noscript> elements (dropped from a copy
+    in the browser), so less crosses the wire than with driver.page_source. None of it is
+    table text.
+    """
+    try:
+        return driver.execute_script(
+            "const doc = document.documentElement.cloneNode(true);"
+            "doc.querySelectorAll('script, style, noscript').forEach(el => el.remove());"
+            "return doc.outerHTML;"
+        )
+    except WebDriverException:
+        return driver.page_source
+
+
+def peek_html(driver, limit: int = 1000) -> str:
+    """First `limit` chars of the page HTML for error logs, sliced in the browser so only those cross the wire."""
+    try:
+        return driver.execute_script("return document.documentElement.outerHTML.slice(0, arguments[0])", limit)
+    except WebDriverException:
+        return driver.page_source[:limit]
+
+
 def get_view_buttons(driver):
-    # This matches value="View", value ="View ", etc.
-    return driver.find_elements(
-        By.XPATH,
-        "//input[@type='button' and contains(normalize-space(@value), 'View')]"
+    return driver.find_elements(By.XPATH, VIEW_BUTTON_XPATH)
+
+
+
+def is_row_saved(out_path: Path, existing: Optional[set] = None, in_db: Optional[set] = None) -> bool:
+    """
+    True if a previous run already wrote this row's PDF and text (both non-empty). `existing`, a
+    set of names in OUTPUT_DIR, rules out missing files without a stat() each. `in_db`, the
+    pdf_path values in the requests table, also requires the row to have been committed (files
+    of rows lost with an uncommitted batch are written again).
+    """
+    txt_path = out_path.with_suffix(".txt")
+    if in_db is not None and str(out_path) not in in_db:
+        return False
+    if existing is not None and (out_path.name not in existing or txt_path.name not in existing):
+        return False
+    try:
+        return out_path.stat().st_size > 0 and txt_path.stat().st_size > 0
+    except FileNotFoundError:
+        return False
+
+
+def open_row(driver, idx: int, btn) -> Optional[str]:
+    """
+    Click row idx's View button; returns the detail tab's handle, or None if it navigated in place.
+    A new detail tab gets BLOCKED_URLS right away, before most of its page has loaded; the list
+    tab stays current.
+    """
+    old_url = driver.current_url
+    debug(f"Clicking View for row {idx + 1}…")
+    detail_handle = open_detail_tab(driver, btn, old_url, timeout=8)
+    if detail_handle:
+        list_handle = driver.current_window_handle
+        driver.switch_to.window(detail_handle)
+        block_urls(driver)
+        driver.switch_to.window(list_handle)
+    return detail_handle
+
+
+def row_out_path(years: str, idx: int, meta: tuple, btn=None) -> Path:
+    """PDF path for row idx, labelled from its list-page fields (or, failing that, the button's row text)."""
+    request_date, reference_num, queue_title, start_date = meta
+    label_parts = [p for p in [request_date, start_date, reference_num, queue_title] if p]
+    if label_parts:
+        safe_label = sanitize_filename("_".join(label_parts))
+    else:
+        # Fallback to whatever text we can get from the enclosing row(s)
+        row_text = f"row_{idx + 1}"
+        if btn is not None:
+            try:
+                outer_row = btn.find_element(
+                    By.XPATH,
+                    "./ancestor::tr[1]"
+                )
+                row_text = outer_row.text.strip().replace("\n", " | ")
+            except (NoSuchElementException, StaleElementReferenceException):
+                pass
+        safe_label = sanitize_filename(row_text) or f"row_{idx + 1}"
+
+    return OUTPUT_DIR / f"{years}_{idx + 1:03d}_{safe_label}.pdf"
+
+
+def save_row_pdf(driver, wait, idx: int, meta: tuple, out_path: Path, detail_handle: Optional[str]) -> str:
+    """
+    Save the detail page opened by open_row() to out_path (PDF) and return its HTML for
+    build_record(). Leaves the detail tab (if any) current.
+    """
+    request_date, reference_num, queue_title, start_date = meta
+
+    # Log the specific columns for the user
+    print(
+        f"[INFO] Row {idx + 1}: Request date='{request_date or 'N/A'}' | "
+        f"Start date='{start_date or 'N/A'}' | "
+        f"Reference #='{reference_num or 'N/A'}' | Queue='{queue_title or 'N/A'}'"
+    )
+
+    if detail_handle:
+        driver.switch_to.window(detail_handle)
+
+    try:
+        if detail_handle:
+            wait.until(left_about_blank)
+        wait_for_page_load(driver, wait)
+    except TimeoutException:
+        pass
+
+    print(f"[INFO] Saving PDF for row {idx + 1} → {out_path}")
+    print_current_page_to_pdf(driver, out_path)
+    return page_html(driver)
+
+
+def build_record(idx: int, meta: tuple, out_path: Path, html: str) -> dict:
+    """
+    Write row idx's .txt from the detail page HTML and return the record that save_request()
+    persists. Needs no driver, so main() runs it on a worker thread.
+    """
+    request_date, reference_num, queue_title, start_date = meta
+    txt_path = out_path.with_suffix(".txt")
+    print(f"[INFO] Saving text for row {idx + 1} → {txt_path}")
+    sections, summary_items, overview = save_detail_text(html, txt_path)
+    if not overview.get("ref_code"):
+        overview["ref_code"] = extract_queue_code(queue_title)
+
+    return {
+        "row_index": idx + 1,
+        "request_date": request_date,
+        "start_date": start_date,
+        "reference_num": reference_num,
+        "queue_title": queue_title,
+        "pdf_path": str(out_path),
+        "txt_path": str(txt_path),
+        "sections": sections,
+        "summary_items": summary_items,
+        "overview": overview,
+    }
+
+
+def save_row(driver, wait, idx: int, meta: tuple, out_path: Path, detail_handle: Optional[str]) -> dict:
+    """save_row_pdf() + build_record() in one go."""
+    html = save_row_pdf(driver, wait, idx, meta, out_path, detail_handle)
+    return build_record(idx, meta, out_path, html)
+
+
+def process_row(driver, wait, idx: int, btn, meta: tuple, out_path: Path):
+    """
+    Open one request's detail page from its View button, save it as PDF + text, and return
+    (record, detail_handle). record holds everything save_request() needs; detail_handle is the
+    new tab (still current) or None if the list tab navigated in place.
+    """
+    detail_handle = open_row(driver, idx, btn)
+    return save_row(driver, wait, idx, meta, out_path, detail_handle), detail_handle
+
+
+def return_to_list(driver, wait, idx: int, detail_handle: Optional[str], list_handle: str,
+                   list_url: Optional[str]) -> bool:
+    """Get back to the list page after process_row(); returns False if it could not be restored."""
+    if detail_handle:
+        # The list tab never navigated: just drop the detail tab
+        driver.close()
+        driver.switch_to.window(list_handle)
+        return True
+
+    # Go back to the list page for the next row
+    debug(f"Going back to list after row {idx + 1}")
+    driver.back()
+
+    if not ensure_list_page(driver, wait, list_url):
+        print("[ERROR] After back(), could not return to list page; stopping.")
+        print(peek_html(driver))
+        return False
+    return True
+
+
+# SQL statements, built once; sqlite3 then reuses one prepared statement per string
+SUMMARY_ITEM_COLUMNS = (
+    "row_order", "row_type", "item_no", "trans_date", "description",
+    "trans_amount", "non_mc_expense", "allowable_expense", "currency", "exch_rate",
+    "cad_amount", "label",
+)
+# Pulls an extract_summary_items() dict's values in column order with one C-level call
+_SUMMARY_ITEM_VALUES = operator.itemgetter(*SUMMARY_ITEM_COLUMNS)
+INSERT_REQUEST_SQL = (
+    "INSERT INTO requests (years, row_index, request_date, start_date, reference_num, queue_title, pdf_path, txt_path) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+)
+INSERT_OVERVIEW_SQL = (
+    "INSERT OR REPLACE INTO request_overview ("
+    "request_id, paid_to, destination_city, grand_total, request_status, payment_info_text, ref_code) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?)"
+)
+INSERT_SECTION_PREFIX = "INSERT INTO sections (request_id, section_name, content) VALUES "
+# Rows per multi-row sections INSERT; 300 * 3 stays under older SQLite's 999 bound-variable limit
+SECTION_ROWS_PER_INSERT = 300
+SELECT_REQUEST_BY_PDF_SQL = "SELECT id FROM requests WHERE pdf_path = ?"
+# Children first; each is keyed by the requests.id it belongs to
+DELETE_REQUEST_SQLS = (
+    "DELETE FROM summary_items WHERE request_id = ?",
+    "DELETE FROM sections WHERE request_id = ?",
+    "DELETE FROM request_overview WHERE request_id = ?",
+    "DELETE FROM requests WHERE id = ?",
+)
+INSERT_ITEM_SQL = (
+    f"INSERT INTO summary_items (request_id, {', '.join(SUMMARY_ITEM_COLUMNS)}) "
+    f"VALUES (?{', ?' * len(SUMMARY_ITEM_COLUMNS)})"
+)
+
+
+@lru_cache(maxsize=None)
+def insert_sections_sql(rows: int) -> str:
+    """The multi-row sections INSERT for `rows` rows, built once per row count like the constants above."""
+    return INSERT_SECTION_PREFIX + ", ".join(("(?, ?, ?)",) * rows)
+
+
+def save_request(conn: sqlite3.Connection, years: str, record: dict):
+    """
+    Insert one processed request (see process_row) into SQLite; db_writer decides when to commit.
+    Uses the connection's execute shortcuts, whose throwaway cursors are made in C.
+    Saving a row file again (e.g. its PDF was deleted) replaces what an earlier run stored for it.
+    """
+    overview = record["overview"]
+    old_ids = conn.execute(SELECT_REQUEST_BY_PDF_SQL, (record["pdf_path"],)).fetchall()
+    if old_ids:
+        for sql in DELETE_REQUEST_SQLS:
+            conn.executemany(sql, old_ids)
+    req_id = conn.execute(
+        INSERT_REQUEST_SQL,
+        (
+            years,
+            record["row_index"],
+            record["request_date"],
+            record["start_date"],
+            record["reference_num"],
+            record["queue_title"],
+            record["pdf_path"],
+            record["txt_path"],
+        ),
+    ).lastrowid
+    conn.execute(
+        INSERT_OVERVIEW_SQL,
+        (
+            req_id,
+            overview.get("paid_to", ""),
+            overview.get("destination_city", ""),
+            overview.get("grand_total", ""),
+            overview.get("request_status", ""),
+            overview.get("payment_info_text", ""),
+            overview.get("ref_code", ""),
+        ),
+    )
+    # A request has only a handful of sections: one multi-row INSERT stores them all
+    sections = record["sections"]
+    for start in range(0, len(sections), SECTION_ROWS_PER_INSERT):
+        chunk = sections[start:start + SECTION_ROWS_PER_INSERT]
+        conn.execute(
+            insert_sections_sql(len(chunk)),
+            [value for name, content in chunk for value in (req_id, name, content)],
+        )
+    # Item rows are fed to executemany as a generator, so no second copy of every row is built
+    conn.executemany(
+        INSERT_ITEM_SQL,
+        ((req_id, *_SUMMARY_ITEM_VALUES(item)) for item in record["summary_items"]),
+    )
+
+def db_writer(conn: sqlite3.Connection, q: queue.Queue):
+    """
+    Body of the SQLite writer thread, the only user of conn once started: saves each
+    (years, record) taken from q until it gets None. Commits (and their fsyncs) thus overlap the
+    next page load instead of holding up the browser loop. Records are committed in groups of up
+    to COMMIT_EVERY, and whenever the queue runs dry, so a crash loses at most what was queued.
+    No error ends the thread early: a dead writer would leave the browser loop blocked on a full
+    queue, so failures are logged and the writer keeps draining.
+    """
+    batch = []  # row numbers inserted since the last commit
+
+    def commit():
+        try:
+            conn.commit()
+        except sqlite3.Error as exc:
+            abandon(exc)
+        return []
+
+    def abandon(exc):
+        # SQLite may already have rolled back the whole transaction (SQLITE_FULL, IOERR, ...)
+        try:
+            conn.rollback()
+        except sqlite3.Error:
+            pass
+        if batch:
+            lost = ", ".join(str(n) for n in batch)
+            print(f"[ERROR] Rolled back {DB_PATH} after: {exc} (lost uncommitted rows {lost})")
+
+    while True:
+        if batch and (len(batch) >= COMMIT_EVERY or q.empty()):
+            batch = commit()
+        item = q.get()
+        if item is None:
+            commit()
+            # Refresh planner statistics so the request_id / reference_num indexes get used
+            try:
+                conn.execute("PRAGMA optimize")
+            except sqlite3.Error as exc:
+                print(f"[WARN] PRAGMA optimize failed on {DB_PATH}: {exc}")
+            return
+        years, record = item
+        # Each record gets a savepoint inside the open batch transaction, so a failing one is
+        # undone on its own. The explicit BEGIN keeps RELEASE from committing by itself.
+        undone = False
+        try:
+            if not conn.in_transaction:
+                conn.execute("BEGIN")
+            conn.execute("SAVEPOINT rec")
+            try:
+                save_request(conn, years, record)
+            except Exception:
+                conn.execute("ROLLBACK TO rec")
+                conn.execute("RELEASE rec")
+                undone = True
+                raise
+            conn.execute("RELEASE rec")
+            batch.append(record["row_index"])
+        except Exception as exc:
+            print(f"[ERROR] Could not save row {record['row_index']} to {DB_PATH}: {exc}"
+                  + (" (rolled back)" if undone else ""))
+            if not undone:
+                # The savepoint itself failed: the open batch is in an unknown state
+                abandon(exc)
+                batch = []
+
+def run_worker(address: str, tasks: queue.Queue, rows_meta: list, out_paths: list, years: str,
+               db_queue: queue.Queue, ready: threading.Barrier, done: list):
+    """
+    One run_parallel() worker: attach to the Chrome at address with a session of its own, check it
+    shows the same list, wait at `ready` for the other workers, then take row indexes from tasks
+    until none are left. Records go to db_queue like in the sequential loop; each row index is
+    then appended to `done`.
+    """
+    driver = None
+    ok = False
+    try:
+        try:
+            driver = setup_driver(address)
+            wait = BackoffWait(driver, 15)
+            if not ensure_list_page(driver, wait):
+                print(f"[ERROR] Worker on {address}: could not get to 'View All Requests' list page.")
+            elif harvest_rows(driver) != rows_meta:
+                print(f"[ERROR] Worker on {address}: list page does not match the main Chrome's list; "
+                      "use the same date range in every window.")
+            else:
+                ok = True
+        except WebDriverException as exc:
+            print(f"[ERROR] Worker on {address}: could not attach to Chrome ({exc.msg}).")
+        finally:
+            # Rows are handed out only once every Chrome has attached and checked its list (or
+            # failed to), so the slow first-call setup of each session is paid up front, together.
+            try:
+                ready.wait(WARMUP_TIMEOUT)
+            except threading.BrokenBarrierError:
+                pass
+        if not ok:
+            return
+
+        list_url = driver.current_url
+        list_handle = driver.current_window_handle
+
+        view_buttons = None
+        while True:
+            try:
+                idx = tasks.get_nowait()
+            except queue.Empty:
+                return
+            if view_buttons is None:
+                view_buttons = get_view_buttons(driver)
+            if idx >= len(view_buttons):
+                print(f"[WARN] Worker on {address} only sees {len(view_buttons)} View buttons; "
+                      f"skipping row {idx + 1}.")
+                continue
+
+            record, detail_handle = process_row(driver, wait, idx, view_buttons[idx], rows_meta[idx], out_paths[idx])
+            db_queue.put((years, record))
+            done.append(idx)
+            if detail_handle is None:
+                view_buttons = None
+            if not return_to_list(driver, wait, idx, detail_handle, list_handle, list_url):
+                print(f"[WARN] Worker on {address} lost the list page; other workers take its remaining rows.")
+                return
+    finally:
+        if driver is not None:
+            driver.quit()
+
+
+def run_parallel(db_queue: queue.Queue, rows_meta: list, out_paths: list, years: str, todo: list) -> int:
+    """
+    Spread the todo rows over one worker thread per Chrome in DEBUGGER_ADDRESSES. Each thread has
+    its own WebDriver session (a session is never shared between threads); they mostly wait on
+    Chrome, so the GIL is not the limit. Every Chrome must be logged in and showing the same
+    'View All Requests' list. Workers pull rows from one shared queue, so a slow or failed Chrome
+    leaves its rows to the others; records go to the db_writer thread, the only SQLite writer.
+    Returns how many rows were processed; a worker that fails is logged, not re-raised.
+    """
+    tasks = queue.Queue()
+    for idx in todo:
+        tasks.put(idx)
+
+    print(f"[INFO] Processing {len(todo)} rows with {len(DEBUGGER_ADDRESSES)} Chrome workers.")
+    done = []  # list.append is atomic, so workers share it without a lock
+    ready = threading.Barrier(
+        len(DEBUGGER_ADDRESSES), action=lambda: print("[INFO] All Chrome workers attached; starting rows.")
     )
+    with ThreadPoolExecutor(len(DEBUGGER_ADDRESSES), thread_name_prefix="chrome") as pool:
+        workers = [
+            pool.submit(run_worker, address, tasks, rows_meta, out_paths, years, db_queue, ready, done)
+            for address in DEBUGGER_ADDRESSES
+        ]
+    for address, worker in zip(DEBUGGER_ADDRESSES, workers):
+        try:
+            worker.result()
+        except Exception as exc:
+            print(f"[ERROR] Worker on {address} stopped: {exc!r}")
+    return len(done)
 
 
+def report_rows(total: int, skipped: int, processed: int):
+    """Final summary line: all rows done, or how many this run left for the next one."""
+    left = total - skipped - processed
+    if left <= 0:
+        print("[INFO] Finished processing all View buttons.")
+    else:
+        print(f"[WARN] Stopped early: {left} of {total} rows not done "
+              f"({processed} processed, {skipped} already saved); run again to resume.")
 
 def main():
-    if not ensure_debug_chrome():
+    if not all(ensure_debug_chrome(address) for address in DEBUGGER_ADDRESSES):
         return
 
-    driver = setup_driver()
-    wait = WebDriverWait(driver, 15)
-    init_db()
+    driver = setup_driver(DEBUGGER_ADDRESSES[0])
+    wait = BackoffWait(driver, 15)
+    # One connection for the whole run, owned by the writer thread; records are queued to it
+    conn = init_db()
+    # Rows already committed by earlier runs; read before the writer thread takes over conn
+    in_db = {path for (path,) in conn.execute("SELECT pdf_path FROM requests")}
+    db_queue = queue.Queue(maxsize=16)
+    db_thread = threading.Thread(target=db_writer, args=(conn, db_queue), name="db-writer")
+    db_thread.start()
 
     try:
         print()
         print("Make sure the current tab is on the 'View All Requests' page with the View buttons.")
+        if len(DEBUGGER_ADDRESSES) > 1:
+            print(f"Do this in every Chrome ({', '.join(DEBUGGER_ADDRESSES)}), with the same date range.")
         print("Log in / navigate if needed, then press Enter here to start processing...")
         # Show a flashing block cursor on the same line so it's obvious input is expected.
-        stop_prompt = start_blinking_prompt("> ", interval=0.5)
+        restore_cursor = start_blinking_prompt("> ")
         try:
             input()
         finally:
-            stop_prompt.set()
+            restore_cursor()
             # Move to the next line after stopping the prompt
             print()
 
-        print("[DEBUG] Current URL:", driver.current_url)
+        debug("Current URL:", driver.current_url)
 
         # Ensure we are on the list page, not a detail 'View' page
         if not ensure_list_page(driver, wait):
             print("[ERROR] Could not get to 'View All Requests' list page "
                   "after a few back() attempts.")
-            print(driver.page_source[:1000])
+            print(peek_html(driver))
             return
 
         # Remember the URL of the list page so we can reload it if "back" fails later.
         list_url = driver.current_url
+        list_handle = driver.current_window_handle
 
         # Now we *know* we're on the list page with the buttons
         try:
             wait.until(
-                EC.presence_of_all_elements_located(
-                    (By.XPATH,
-                     "//input[@type='button' and contains(normalize-space(@value), 'View')]")
-                )
+                EC.presence_of_all_elements_located((By.XPATH, VIEW_BUTTON_XPATH))
             )
         except TimeoutException:
             print("[ERROR] No View buttons found on the list page.")
-            print(driver.page_source[:1000])
+            print(peek_html(driver))
             return
 
-        initial_buttons = get_view_buttons(driver)
-        num = len(initial_buttons)
+        # One in-browser pass collects every row's fields; the list tab never changes after this
+        try:
+            rows_meta = harvest_rows(driver)
+        except WebDriverException as exc:
+            print(f"[WARN] Batch row extraction failed ({exc.msg}); reading rows one by one.")
+            rows_meta = [extract_row_fields(b) for b in get_view_buttons(driver)]
+        num = len(rows_meta)
         print(f"[INFO] Found {num} View buttons.")
 
         if num == 0:
             return
 
         # Determine year range from first and last request dates on the page
-        first_req, _, _, first_start = extract_row_fields(initial_buttons[0])
-        last_req, _, _, last_start = extract_row_fields(initial_buttons[-1])
+        first_req, _, _, first_start = rows_meta[0]
+        last_req, _, _, last_start = rows_meta[-1]
         y1, y2 = extract_year(first_start), extract_year(last_start)
         if y1 and y2:
             years = y1 if y1 == y2 else f"{y1}-{y2}"
@@ -924,171 +1657,124 @@ def main():
 
         # Save the initial list page as an index PDF
         # Ensure the index filename is unique; append a counter if needed.
+        # One directory listing answers every "does this file exist?" below
+        existing = set(os.listdir(OUTPUT_DIR))
         base_index_name = f"{years}_index"
-        index_path = OUTPUT_DIR / f"{base_index_name}.pdf"
+        index_name = f"{base_index_name}.pdf"
         counter = 1
-        while index_path.exists():
-            index_path = OUTPUT_DIR / f"{base_index_name}-{counter}.pdf"
+        while index_name in existing:
+            index_name = f"{base_index_name}-{counter}.pdf"
             counter += 1
+        index_path = OUTPUT_DIR / index_name
 
         print(f"[INFO] Saving index page → {index_path}")
         print_current_page_to_pdf(driver, index_path)
 
-        for idx in range(num):
-            # Re-fetch on each iteration (page changes after click/back)
-            view_buttons = get_view_buttons(driver)
-            if idx >= len(view_buttons):
-                print(f"[WARN] After navigation, only {len(view_buttons)} View buttons remain; "
-                      f"skipping index {idx + 1}.")
-                break
-
-            btn = view_buttons[idx]
-            request_date, reference_num, queue_title, start_date = extract_row_fields(btn)
-
-            # Log the specific columns for the user
-            print(
-                f"[INFO] Row {idx + 1}: Request date='{request_date or 'N/A'}' | "
-                f"Start date='{start_date or 'N/A'}' | "
-                f"Reference #='{reference_num or 'N/A'}' | Queue='{queue_title or 'N/A'}'"
-            )
+        # Work out every row's output path up front so the click loop only does navigation and I/O
+        view_buttons = get_view_buttons(driver)
+        out_paths = [
+            row_out_path(years, idx, meta, view_buttons[idx] if idx < len(view_buttons) else None)
+            for idx, meta in enumerate(rows_meta)
+        ]
 
-            label_parts = [p for p in [request_date, start_date, reference_num, queue_title] if p]
-            if label_parts:
-                safe_label = sanitize_filename("_".join(label_parts))
+        # Re-runs after a crash skip rows whose PDF + text were already written and committed
+        todo = []
+        for idx, out_path in enumerate(out_paths):
+            if is_row_saved(out_path, existing, in_db):
+                print(f"[INFO] Skipping row {idx + 1} (already saved: {out_path.name})")
             else:
-                # Fallback to whatever text we can get from the enclosing row(s)
-                try:
-                    outer_row = btn.find_element(
-                        By.XPATH,
-                        "./ancestor::tr[1]"
-                    )
-                    row_text = outer_row.text.strip().replace("\n", " | ")
-                except NoSuchElementException:
-                    row_text = f"row_{idx + 1}"
-                safe_label = sanitize_filename(row_text) or f"row_{idx + 1}"
-
-            out_path = OUTPUT_DIR / f"{years}_{idx + 1:03d}_{safe_label}.pdf"
-
-            old_url = driver.current_url
-            print(f"[DEBUG] Clicking View for row {idx + 1}…")
-            btn.click()
-
-            # Wait for navigation or element staleness with a shorter timeout to avoid stalls
-            wait_for_navigation(driver, old_url, btn, timeout=8, poll=0.2)
-
-            try:
-                wait.until(
-                    lambda d: d.execute_script("return document.readyState") == "complete"
-                )
-            except TimeoutException:
-                pass
-
-            print(f"[INFO] Saving PDF for row {idx + 1} → {out_path}")
-            print_current_page_to_pdf(driver, out_path)
-
-            txt_path = out_path.with_suffix(".txt")
-            print(f"[INFO] Saving text for row {idx + 1} → {txt_path}")
-            sections, summary_items, overview = save_detail_text(driver, txt_path)
-            if not overview.get("ref_code"):
-                overview["ref_code"] = extract_queue_code(queue_title)
-
-            # Persist to SQLite
-            conn = sqlite3.connect(DB_PATH)
-            cur = conn.cursor()
-            cur.execute(
-                """
-                INSERT INTO requests (years, row_index, request_date, start_date, reference_num, queue_title, pdf_path, txt_path)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                """,
-                (
-                    years,
-                    idx + 1,
-                    request_date,
-                    start_date,
-                    reference_num,
-                    queue_title,
-                    str(out_path),
-                    str(txt_path),
-                ),
-            )
-            req_id = cur.lastrowid
-            cur.execute(
-                """
-                INSERT OR REPLACE INTO request_overview (
-                    request_id, paid_to, destination_city, grand_total, request_status, payment_info_text, ref_code
-                )
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-                """,
-                (
-                    req_id,
-                    overview.get("paid_to", ""),
-                    overview.get("destination_city", ""),
-                    overview.get("grand_total", ""),
-                    overview.get("request_status", ""),
-                    overview.get("payment_info_text", ""),
-                    overview.get("ref_code", ""),
-                ),
-            )
-            for name, content in sections:
-                cur.execute(
-                    """
-                    INSERT INTO sections (request_id, section_name, content)
-                    VALUES (?, ?, ?)
-                    """,
-                    (req_id, name, content),
-                )
-            for item in summary_items:
-                cur.execute(
-                    """
-                    INSERT INTO summary_items (
-                        request_id, row_order, row_type, item_no, trans_date, description,
-                        trans_amount, non_mc_expense, allowable_expense, currency, exch_rate,
-                        cad_amount, label
-                    )
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    """,
-                    (
-                        req_id,
-                        item.get("row_order"),
-                        item.get("row_type"),
-                        item.get("item_no"),
-                        item.get("trans_date"),
-                        item.get("description"),
-                        item.get("trans_amount"),
-                        item.get("non_mc_expense"),
-                        item.get("allowable_expense"),
-                        item.get("currency"),
-                        item.get("exch_rate"),
-                        item.get("cad_amount"),
-                        item.get("label"),
-                    ),
-                )
-            conn.commit()
-            conn.close()
+                todo.append(idx)
+        if not todo:
+            print("[INFO] All rows already saved; nothing to do.")
+            return
 
-            # Go back to the list page for the next row
-            print(f"[DEBUG] Going back to list after row {idx + 1}")
-            driver.back()
+        if len(DEBUGGER_ADDRESSES) > 1:
+            processed = run_parallel(db_queue, rows_meta, out_paths, years, todo)
+            report_rows(num, num - len(todo), processed)
+            return
 
-            if not ensure_list_page(driver, wait, list_url):
-                print("[ERROR] After back(), could not return to list page; stopping.")
-                print(driver.page_source[:1000])
-                break
+        # Parsing a detail page (BeautifulSoup + .txt) needs no browser, so it runs on a worker
+        # thread while this one drives Chrome to the next row; records are saved in row order.
+        parser = ThreadPoolExecutor(max_workers=1)
+        parsed = deque()  # build_record() futures not yet saved
+        # Button handles stay valid while the list tab is untouched; they are only
+        # re-fetched after a back()/reload re-renders the list (view_buttons = None).
+        # Up to PREFETCH detail tabs are opened ahead so their page loads overlap; they are
+        # still saved one at a time, in row order, from this single WebDriver session.
+        pending = deque()  # (idx, detail_handle)
+        next_pos = 0  # position in todo of the next row to open
+        backs = 0  # back() returns to the list since the last reload
+        processed = 0
+        try:
+            for done in range(len(todo)):
+                # Only open more tabs while the list tab itself is on the list (no in-place row pending)
+                while next_pos < len(todo) and len(pending) < PREFETCH and not (pending and pending[-1][1] is None):
+                    if view_buttons is None:
+                        view_buttons = get_view_buttons(driver)
+                    next_idx = todo[next_pos]
+                    if next_idx >= len(view_buttons):
+                        print(f"[WARN] After navigation, only {len(view_buttons)} View buttons remain; "
+                              f"skipping index {next_idx + 1}.")
+                        next_pos = len(todo)
+                        break
+                    pending.append((next_idx, open_row(driver, next_idx, view_buttons[next_idx])))
+                    next_pos += 1
+                if not pending:
+                    break
 
-            # Periodically reload the list page to avoid server/session weirdness
-            # seen after many back() navigations (e.g., "Unknown option" errors).
-            if RELOAD_EVERY > 0 and (idx + 1) % RELOAD_EVERY == 0 and (idx + 1) < num:
-                print(f"[INFO] Reloading list page after {idx + 1} rows (RELOAD_EVERY={RELOAD_EVERY}) via toolbar reload.")
-                reload_like_user(driver, wait)
-                if not ensure_list_page(driver, wait, list_url):
-                    # ensure_list_page already attempted recovery (back/submit/reload)
-                    print("[ERROR] Reload failed; could not restore list page after refresh.")
-                    print(driver.page_source[:1000])
+                # Stays in pending until return_to_list() has closed its tab (see the cleanup below)
+                row_idx, detail_handle = pending[0]
+                html = save_row_pdf(driver, wait, row_idx, rows_meta[row_idx], out_paths[row_idx], detail_handle)
+                parsed.append(parser.submit(build_record, row_idx, rows_meta[row_idx], out_paths[row_idx], html))
+                processed += 1
+                while parsed and parsed[0].done():
+                    db_queue.put((years, parsed.popleft().result()))
+
+                if detail_handle is None:
+                    view_buttons = None
+                    backs += 1
+                returned = return_to_list(driver, wait, row_idx, detail_handle, list_handle, list_url)
+                pending.popleft()
+                if not returned:
                     break
 
-        print("[INFO] Finished processing all View buttons.")
+                # Reload the list page after many back() navigations to avoid server/session
+                # weirdness (e.g., "Unknown option" errors); a healthy tab-only run never reloads.
+                if RELOAD_EVERY > 0 and backs >= RELOAD_EVERY and (done + 1) < len(todo):
+                    print(f"[INFO] Reloading list page after {backs} back() returns (RELOAD_EVERY={RELOAD_EVERY}) via toolbar reload.")
+                    backs = 0
+                    reload_like_user(driver, wait)
+                    view_buttons = None
+                    if not ensure_list_page(driver, wait, list_url):
+                        # ensure_list_page already attempted recovery (back/submit/reload)
+                        print("[ERROR] Reload failed; could not restore list page after refresh.")
+                        print(peek_html(driver))
+                        break
+        finally:
+            # A loop cut short leaves prefetched detail tabs open; close them in the user's Chrome
+            leftover = [handle for _, handle in pending if handle]
+            for handle in leftover:
+                try:
+                    driver.switch_to.window(handle)
+                    driver.close()
+                except WebDriverException:
+                    pass
+            if leftover:
+                try:
+                    driver.switch_to.window(list_handle)
+                except WebDriverException:
+                    pass
+            parser.shutdown()
+            while parsed:
+                db_queue.put((years, parsed.popleft().result()))
+
+        report_rows(num, num - len(todo), processed)
 
     finally:
+        # Let the writer finish what is queued before closing its connection
+        db_queue.put(None)
+        db_thread.join()
+        conn.close()
         driver.quit()
 
 if __name__ == "__main__":